@@ -78,23 +78,29 @@ CONFIG_SCHEMA = {
     }
 }
 
+# Custom validators referenced by CONFIG_SCHEMA
+CONFIG_VALIDATORS = {
+    'daemon_name': validation.daemon_name_validator,
+    'machine_name': validation.machine_name_validator,
+}
+
 
 class Config:
     """Daemon configuration parsed from a json file"""
+    __slots__ = ('daemon', 'log_name', 'control_ips', 'serial_port', 'serial_baud', 'serial_timeout',
+                 'idle_loop_delay', 'moving_loop_delay', 'move_timeout', 'home_reset_timeout', 'soft_step_limits')
+
     def __init__(self, config_filename):
         # Will throw on file not found or invalid json
         with open(config_filename, 'r') as config_file:
             config_json = json.load(config_file)
 
         # Will throw on schema violations
-        validation.validate_config(config_json, CONFIG_SCHEMA, {
-            'daemon_name': validation.daemon_name_validator,
-            'machine_name': validation.machine_name_validator,
-        })
+        validation.validate_config(config_json, CONFIG_SCHEMA, CONFIG_VALIDATORS)
 
         self.daemon = getattr(daemons, config_json['daemon'])
         self.log_name = config_json['log_name']
-        self.control_ips = [getattr(IP, machine) for machine in config_json['control_machines']]
+        self.control_ips = frozenset(getattr(IP, machine) for machine in config_json['control_machines'])
         self.serial_port = config_json['serial_port']
         self.serial_baud = int(config_json['serial_baud'])
         self.serial_timeout = int(config_json['serial_timeout'])
@@ -103,4 +109,4 @@ class Config:
         self.moving_loop_delay = int(config_json['moving_loop_delay'])
         self.move_timeout = int(config_json['move_timeout'])
         self.home_reset_timeout = int(config_json['home_reset_timeout'])
-        self.soft_step_limits = [int(l) for l in config_json['soft_step_limits']]
+        self.soft_step_limits = tuple(int(l) for l in config_json['soft_step_limits'])
@@ -51,8 +51,9 @@ class CommandStatus:
     @classmethod
     def message(cls, error_code):
         """Returns a human readable string describing an error code"""
-        if error_code in cls._messages:
-            return cls._messages[error_code]
+        message = cls._messages.get(error_code)
+        if message is not None:
+            return message
         return 'error: Unknown error code {}'.format(error_code)
 
 
@@ -60,34 +61,38 @@ class FocuserStatus:
     """Status of the focuser hardware"""
     Disabled, Disconnected, Error, Initializing, Idle, Moving = range(6)
 
-    _labels = {
-        0: 'OFFLINE',
-        1: 'DISCONNECTED',
-        2: 'ERROR',
-        3: 'INITIALIZING',
-        4: 'IDLE',
-        5: 'MOVING',
-    }
+    _labels = (
+        'OFFLINE',
+        'DISCONNECTED',
+        'ERROR',
+        'INITIALIZING',
+        'IDLE',
+        'MOVING',
+    )
 
-    _formats = {
-        0: TFmt.Bold + TFmt.Red,
-        1: TFmt.Bold + TFmt.Red,
-        2: TFmt.Bold + TFmt.Red,
-        3: TFmt.Bold + TFmt.Yellow,
-        4: TFmt.Bold,
-        5: TFmt.Bold + TFmt.Yellow,
-    }
+    _formats = (
+        TFmt.Bold + TFmt.Red,
+        TFmt.Bold + TFmt.Red,
+        TFmt.Bold + TFmt.Red,
+        TFmt.Bold + TFmt.Yellow,
+        TFmt.Bold,
+        TFmt.Bold + TFmt.Yellow,
+    )
+
+    # The formatted labels are a fixed set, so build them once
+    _formatted_labels = tuple(f + l + TFmt.Clear for f, l in zip(_formats, _labels))
+    _formatted_unknown = TFmt.Red + TFmt.Bold + 'UNKNOWN' + TFmt.Clear
 
     @classmethod
     def label(cls, status, formatting=False):
         """Returns a human readable string describing a status
            Set formatting=true to enable terminal formatting characters
         """
-        if formatting:
-            if status in cls._formats and status in cls._formats:
-                return cls._formats[status] + cls._labels[status] + TFmt.Clear
-            return TFmt.Red + TFmt.Bold + 'UNKNOWN' + TFmt.Clear
+        if 0 <= status < len(cls._labels):
+            if formatting:
+                return cls._formatted_labels[int(status)]
+            return cls._labels[int(status)]
 
-        if status in cls._labels:
-            return cls._labels[status]
+        if formatting:
+            return cls._formatted_unknown
         return 'UNKNOWN'
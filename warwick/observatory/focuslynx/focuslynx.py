@@ -22,84 +22,193 @@ class UnexpectedResponseError(Exception):
         super().__init__('Unexpected data returned from FocusLynx: expected `{}`, got `{}`'.format(expected, actual))
 
 
-def focuslynx_channel_config(port, channel_number):
+# The Focus Lynx controller has two focuser channels
+# Build the fixed commands and response headers used by the polling loop once at import
+_CHANNELS = (1, 2)
+_GETCONFIG_COMMAND = {c: b'<F%dGETCONFIG>' % c for c in _CHANNELS}
+_GETCONFIG_HEADER = {c: b'CONFIG%d' % c for c in _CHANNELS}
+_GETSTATUS_COMMAND = {c: b'<F%dGETSTATUS>' % c for c in _CHANNELS}
+_GETSTATUS_HEADER = {c: b'STATUS%d' % c for c in _CHANNELS}
+_HALT_COMMAND = {c: b'<F%dHALT>' % c for c in _CHANNELS}
+
+
+def _parse_str(value):
+    return value.decode('ascii').strip()
+
+
+def _parse_flag(value):
+    # Flags are normally reported as a single 0 or 1 digit
+    # Fall back to a numeric comparison to tolerate any other padding
+    if value == b' 1':
+        return True
+    if value == b' 0':
+        return False
+    return int(value) == 1
+
+
+def _parse_disabled(value):
+    # Temperature and backlash compensation must be disabled in the controller
+    if int(value) != 0:
+        raise ValueError(value)
+    return False
+
+
+# Fields that must be present in a GETCONFIG response, keyed by their line prefix
+# Other lines (temperature compensation coefficients, backlash size, LED brightness) are ignored
+_CONFIG_FIELDS = {
+    b'Nickname =': ('nickname', _parse_str),
+    b'Max Pos  =': ('max_steps', int),
+    b'Dev Typ  =': ('device_type', _parse_str),
+    b'TComp ON =': ('temperature_compensation', _parse_disabled),
+    b'BLC En   =': ('backlash_compensation', _parse_disabled),
+    b'TC@Start =': ('temperature_compensation_at_start', _parse_disabled),
+}
+
+# Fields that must be present in a GETSTATUS response, keyed by their line prefix
+# Other lines (IsHoming, IsHomed, FFDetect, TmpProbe, RemoteIO, Hnd Ctlr, Reverse) are ignored
+_STATUS_FIELDS = {
+    b'Temp(C)  =': ('temperature', float),
+    b'Curr Pos =': ('current_steps', int),
+    b'Targ Pos =': ('target_steps', int),
+    b'IsMoving =': ('is_moving', _parse_flag),
+}
+
+
+def _read_until(port, terminator, max_size, count=1):
     """
-    Query and validate the initial configuration state of a focuser channel
+    Read from the serial port until the terminator has been received count times,
+    max_size bytes have been read, or a read times out
+
+    pySerial's read_until() issues a separate read(1) for every byte, so instead
+    read everything that is waiting in the input buffer (blocking for at least one byte)
 
     :param port: Serial port connection
-    :param channel_number: Channel number to query
-    :return: Dictionary containing:
-        nickname
-        device_type
-        max_steps
+    :param terminator: Byte sequence that marks the end of the response
+    :param max_size: Maximum number of bytes to read, so that a stream of noise can't block forever
+    :param count: Number of terminators to read
+    :return: Bytes read from the port
+    """
+    buf = bytearray()
+    while len(buf) < max_size and buf.count(terminator) < count:
+        data = port.read(max(1, min(port.in_waiting, max_size - len(buf))))
+        if not data:
+            break
+        buf += data
+    return bytes(buf)
 
-    :raises UnexpectedResponseError if unexpected data or configuration is found
+
+def _query(port, command, header):
+    """
+    Send a query command and read back the complete response
+
+    :param port: Serial port connection
+    :param command: Encoded command to send
+    :param header: Expected header line following the acknowledgement
+    :return: List of response lines between the header and the END terminator
+
+    :raises UnexpectedResponseError if the acknowledgement, header or terminator are missing
     """
-    # Clear any stray data in the input buffer
-    port.flushInput()
+    port.write(command)
+    # Match END as a whole line so that a nickname ending in END does not stop the read early
+    buf = _read_until(port, b'\nEND\n', 512)
+    lines = buf.split(b'\n')
+    if lines[0] != b'!':
+        raise UnexpectedResponseError('!', lines[0])
 
-    port.write('<F{:1d}GETCONFIG>'.format(channel_number).encode('ascii'))
-    line = port.readline()
-    if line != b'!\n':
-        raise UnexpectedResponseError('!', line)
+    if len(lines) < 2 or lines[1] != header:
+        raise UnexpectedResponseError(header.decode('ascii'), lines[1] if len(lines) > 1 else b'')
 
-    line = port.readline()
-    expected = 'CONFIG{:1d}\n'.format(channel_number).encode('ascii')
-    if line != expected:
-        raise UnexpectedResponseError(expected, line)
+    if len(lines) < 4 or lines[-2] != b'END':
+        raise UnexpectedResponseError('END', buf)
 
-    line = port.readline()
-    if not line.startswith(b'Nickname ='):
-        raise UnexpectedResponseError('Nickname = ...', line)
-    nickname = line[10:].decode('ascii').strip()
+    return lines[2:-2]
 
-    line = port.readline()
-    if not line.startswith(b'Max Pos  ='):
-        raise UnexpectedResponseError('Max Pos = ...', line)
-    max_steps = int(line[10:])
 
-    line = port.readline()
-    if not line.startswith(b'Dev Typ  ='):
-        raise UnexpectedResponseError('Dev Typ  = ...', line)
-    device_type = line[10:].decode('ascii').strip()
+def _command(port, command, response):
+    """
+    Send a command and read back its complete acknowledgement
 
-    line = port.readline()
-    if line != b'TComp ON = 0\n':
-        raise UnexpectedResponseError('TComp ON = 0', line)
+    :param port: Serial port connection
+    :param command: Encoded command to send
+    :param response: Expected response line following the acknowledgement
 
-    # Skip temperature compensation lines
-    for _ in range(6):
-        port.readline()
+    :raises UnexpectedResponseError if the acknowledgement or response are missing
+    """
+    port.write(command)
 
-    line = port.readline()
-    if line != b'BLC En   = 0\n':
-        raise UnexpectedResponseError('BLC En   = 0', line)
+    # Stop after the second line so that an unexpected response fails immediately
+    buf = _read_until(port, b'\n', 64, 2)
+    lines = buf.split(b'\n')
+    if lines[0] != b'!':
+        raise UnexpectedResponseError('!', lines[0])
 
-    # Skip backlash size, LED brightness
-    for _ in range(2):
-        port.readline()
+    if len(lines) != 3 or lines[1] != response:
+        raise UnexpectedResponseError(response.decode('ascii'), lines[1] if len(lines) > 1 else b'')
 
-    line = port.readline()
-    if line != b'TC@Start = 0\n':
-        raise UnexpectedResponseError('TC@Start = 0', line)
 
-    line = port.readline()
-    if line != b'END\n':
-        raise UnexpectedResponseError('END', line)
+def _parse_fields(lines, table):
+    """
+    Parse response lines into a dictionary of field values
+
+    :param lines: Response lines returned by _query
+    :param table: Dictionary mapping a 10 byte line prefix to a (field name, parser) pair
+    :return: Dictionary of parsed values keyed by field name
+
+    :raises UnexpectedResponseError if a field fails to parse or is missing
+    """
+    fields = {}
+    for line in lines:
+        entry = table.get(line[:10])
+        if entry is not None:
+            field, parser = entry
+            try:
+                fields[field] = parser(line[10:])
+            except ValueError:
+                raise UnexpectedResponseError(line[:10].decode('ascii', 'replace') + ' ...', line) from None
+
+    if len(fields) != len(table):
+        for prefix, (field, _) in table.items():
+            if field not in fields:
+                raise UnexpectedResponseError(prefix.decode('ascii') + ' ...', b'\n'.join(lines))
+
+    return fields
+
+
+def focuslynx_channel_config(port, channel_number, flush_input=True):
+    """
+    Query and validate the initial configuration state of a focuser channel
+
+    :param port: Serial port connection
+    :param channel_number: Channel number to query
+    :param flush_input: Clear any stray data in the input buffer before sending the command
+    :return: Dictionary containing:
+        nickname
+        device_type
+        max_steps
+
+    :raises UnexpectedResponseError if unexpected data or configuration is found
+    """
+    if flush_input:
+        port.reset_input_buffer()
+
+    lines = _query(port, _GETCONFIG_COMMAND[channel_number], _GETCONFIG_HEADER[channel_number])
+
+    fields = _parse_fields(lines, _CONFIG_FIELDS)
 
     return {
-        'nickname': nickname,
-        'device_type': device_type,
-        'max_steps': max_steps,
+        'nickname': fields['nickname'],
+        'device_type': fields['device_type'],
+        'max_steps': fields['max_steps'],
     }
 
 
-def focuslynx_channel_status(port, channel_number):
+def focuslynx_channel_status(port, channel_number, flush_input=True):
     """
     Query the current state of a focuser channel
 
     :param port: Serial port connection
     :param channel_number: Channel number to query
+    :param flush_input: Clear any stray data in the input buffer before sending the command
     :return: Dictionary containing:
         temperature
         current_steps
@@ -109,131 +218,67 @@ def focuslynx_channel_status(port, channel_number):
         or None if no focuser is connected
     :raises UnexpectedResponseError if unexpected data or configuration is found
     """
-    # Clear any stray data in the input buffer
-    port.flushInput()
+    if flush_input:
+        port.reset_input_buffer()
 
-    port.write('<F{:1d}GETSTATUS>'.format(channel_number).encode('ascii'))
-    line = port.readline()
-    if line != b'!\n':
-        raise UnexpectedResponseError('!', line)
-
-    line = port.readline()
-    expected = 'STATUS{:1d}\n'.format(channel_number).encode('ascii')
-    if line != expected:
-        raise UnexpectedResponseError(expected, line)
-
-    line = port.readline()
-    if not line.startswith(b'Temp(C)  ='):
-        raise UnexpectedResponseError('Temp(C)  = ...', line)
+    lines = _query(port, _GETSTATUS_COMMAND[channel_number], _GETSTATUS_HEADER[channel_number])
 
     # Use the temperature probe as a proxy for the entire focuser
-    if line[10:] == b' NP\n':
-        # Skip remaining lines
-        for _ in range(11):
-            port.readline()
-
+    # The remaining fields are meaningless if it reads NP (no probe)
+    if b'Temp(C)  = NP' in lines:
         return None
-    temperature = float(line[10:])
-
-    line = port.readline()
-    if not line.startswith(b'Curr Pos ='):
-        raise UnexpectedResponseError('Curr Pos = ...', line)
-    current_steps = int(line[10:])
-
-    line = port.readline()
-    if not line.startswith(b'Targ Pos ='):
-        raise UnexpectedResponseError('Targ Pos = ...', line)
-    target_steps = int(line[10:])
-
-    line = port.readline()
-    if not line.startswith(b'IsMoving ='):
-        raise UnexpectedResponseError('IsMoving = ...', line)
-    is_moving = int(line[10:]) == 1
 
-    #  Skip unused lines:
-    #   IsHoming, IsHomed, FFDetect, TmpProbe
-    #   RemoteIO, Hnd Ctlr, Reverse
-    for _ in range(7):
-        port.readline()
+    return _parse_fields(lines, _STATUS_FIELDS)
 
-    line = port.readline()
-    if line != b'END\n':
-        raise UnexpectedResponseError('END', line)
 
-    return {
-        'temperature': temperature,
-        'current_steps': current_steps,
-        'target_steps': target_steps,
-        'is_moving': is_moving
-    }
-
-
-def focuslynx_set_target_steps(port, channel_number, steps):
+def focuslynx_set_target_steps(port, channel_number, steps, flush_input=True):
     """
     Set the target steps for a focuser channel
 
     :param port: Serial port connection
     :param channel_number: Channel number to query
     :param steps: Value to set the target steps
+    :param flush_input: Clear any stray data in the input buffer before sending the command
 
     :raises UnexpectedResponseError if unexpected data is returned
     """
 
-    # Clear any stray data in the input buffer
-    port.flushInput()
-
-    port.write('<F{:1d}MA{:06d}>'.format(channel_number, steps).encode('ascii'))
-    line = port.readline()
-    if line != b'!\n':
-        raise UnexpectedResponseError('!', line)
+    if flush_input:
+        port.reset_input_buffer()
 
-    line = port.readline()
-    if line != b'M\n':
-        raise UnexpectedResponseError('M', line)
+    _command(port, b'<F%dMA%06d>' % (channel_number, steps), b'M')
 
 
-def focuslynx_stop(port, channel_number):
+def focuslynx_stop(port, channel_number, flush_input=True):
     """
     Stops movement in a focuser channel
 
     :param port: Serial port connection
     :param channel_number: Channel number to query
+    :param flush_input: Clear any stray data in the input buffer before sending the command
 
     :raises UnexpectedResponseError if unexpected data is returned
     """
 
-    # Clear any stray data in the input buffer
-    port.flushInput()
-
-    port.write('<F{:1d}HALT>'.format(channel_number).encode('ascii'))
-    line = port.readline()
-    if line != b'!\n':
-        raise UnexpectedResponseError('!', line)
+    if flush_input:
+        port.reset_input_buffer()
 
-    line = port.readline()
-    if line != b'HALTED\n':
-        raise UnexpectedResponseError('HALTED', line)
+    _command(port, _HALT_COMMAND[channel_number], b'HALTED')
 
 
-def focuslynx_sync(port, channel_number, steps):
+def focuslynx_sync(port, channel_number, steps, flush_input=True):
     """
     Set the current focuser position to the given step position
 
     :param port: Serial port connection
     :param channel_number: Channel number to query
     :param steps: Step count to set the current position
+    :param flush_input: Clear any stray data in the input buffer before sending the command
 
     :raises UnexpectedResponseError if unexpected data is returned
     """
-    # Clear any stray data in the input buffer
-    port.flushInput()
+    if flush_input:
+        port.reset_input_buffer()
 
     # Set the current position to the range midpoint
-    port.write('<F{:1d}SCCP{:06d}>'.format(channel_number, steps).encode('ascii'))
-    line = port.readline()
-    if line != b'!\n':
-        raise UnexpectedResponseError('!', line)
-
-    line = port.readline()
-    if line != b'SET\n':
-        raise UnexpectedResponseError('SET', line)
+    _command(port, b'<F%dSCCP%06d>' % (channel_number, steps), b'SET')